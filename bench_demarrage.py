@@ -0,0 +1,62 @@
+"""
+Mesure le temps d'affichage de la première fenêtre de l'application.
+
+L'application est lancée avec l'option --mesure-demarrage : elle suit le même chemin de
+démarrage qu'un lancement normal, sans créer de fichier de logs, et se ferme dès que la fenêtre
+principale est affichée. La durée de vie du processus mesure donc le démarrage à froid. Les
+résultats sont ajoutés au fichier bench_demarrage.csv pour suivre leur évolution d'une version à
+l'autre.
+
+Usage :
+    python bench_demarrage.py
+    python bench_demarrage.py --repetitions 10 \
+        --commande dist/Telechargement_CFE/Telechargement_CFE.exe
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from time import perf_counter
+
+FICHIER_RESULTATS = "bench_demarrage.csv"
+
+
+def mesurer(commande: list) -> float:
+    """Lance l'application une fois et retourne le temps écoulé jusqu'à sa fermeture."""
+    debut = perf_counter()
+    subprocess.run(commande + ["--mesure-demarrage"], check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return perf_counter() - debut
+
+
+def main():
+    """Mesure le démarrage plusieurs fois, affiche et enregistre les résultats."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--commande", default=None,
+                        help="Exécutable à mesurer (par défaut : python recup_cfe.py).")
+    arguments = parser.parse_args()
+
+    dossier = os.path.dirname(os.path.abspath(__file__))
+    commande = ([arguments.commande] if arguments.commande
+                else [sys.executable, os.path.join(dossier, "recup_cfe.py")])
+
+    durees = [mesurer(commande) for _ in range(arguments.repetitions)]
+    mediane = statistics.median(durees)
+    print(f"Première fenêtre : médiane {mediane:.2f} s | min {min(durees):.2f} s | "
+          f"max {max(durees):.2f} s ({arguments.repetitions} lancements)")
+
+    chemin = os.path.join(dossier, FICHIER_RESULTATS)
+    nouveau = not os.path.exists(chemin)
+    with open(chemin, "a", encoding="utf-8") as fichier:
+        if nouveau:
+            fichier.write("date;commande;repetitions;mediane;min;max\n")
+        fichier.write(f"{datetime.now():%Y-%m-%d %H:%M:%S};{' '.join(commande)};"
+                      f"{arguments.repetitions};{mediane:.3f};{min(durees):.3f};"
+                      f"{max(durees):.3f}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -101,7 +101,10 @@ class WindowApp(ctk.CTk):
         texte = (
             "1. Exportez la liste des SIREN depuis votre logiciel comptable. Les lignes du fichier"
             " devront être au format \'Siren;Nom;Code\' Dossier et à l'extension \'.txt\'.\n\n"
-            "2. Renseignez vos identifiants professionels Impots.gouv.\n\n"
+            "2. Renseignez vos identifiants professionels Impots.gouv. Pour répartir les dossiers"
+            " entre plusieurs comptes, ajoutez-les au fichier \'identifiants.txt\' (identifiant"
+            " puis mot de passe, sur deux lignes par compte) et indiquez éventuellement le compte"
+            " à utiliser en quatrième colonne : \'Siren;Nom;Code;Identifiant\'.\n\n"
             "3. Sélectionnez le fichier de SIREN.\n\n"
             "4. Sélectionnez le répertoire de destination où vous souhaitez que le script "
             "télécharge vos fichiers.\n\n"
@@ -0,0 +1,27 @@
+"""Lecture des paramètres d'exécution depuis les variables d'environnement."""
+import logging
+import os
+
+
+def lire_parametre(nom: str, defaut, convertir=float):
+    """
+    Lit un paramètre d'exécution depuis les variables d'environnement.
+
+    Args:
+        nom (str): Nom de la variable d'environnement (ex. 'CFE_DEBIT_MAX').
+        defaut: Valeur retournée si la variable est absente, vide ou invalide.
+        convertir (callable): Fonction de conversion appliquée à la valeur lue.
+
+    Returns:
+        La valeur convertie, ou la valeur par défaut.
+    """
+    valeur = os.environ.get(nom, "").strip()
+    if not valeur:
+        return defaut
+
+    try:
+        return convertir(valeur)
+    except ValueError:
+        logging.warning("Paramètre %s invalide (%s), valeur par défaut utilisée : %s",
+                        nom, valeur, defaut)
+        return defaut
@@ -0,0 +1,151 @@
+"""Historique des exécutions : résultats par SIREN et latences observées par page."""
+import json
+import logging
+import os
+import threading
+from datetime import date
+
+from configuration import lire_parametre
+
+RESULTATS_IMPRODUCTIFS = ("INACCESSIBLE", "PAS_DE_CFE")
+
+
+class Historique:
+    """
+    Conserve d'une exécution à l'autre le résultat obtenu pour chaque SIREN et la distribution
+    des temps de chargement de chaque page du portail.
+
+    Ces données servent à traiter en premier les dossiers susceptibles d'aboutir, à reporter
+    (ou ignorer) ceux qui échouent d'année en année, et à calibrer les délais d'attente de
+    `WebDriverWait` à partir des percentiles observés plutôt que de constantes.
+
+    Attributes:
+        chemin (str): Chemin du fichier JSON de l'historique.
+        resultats (dict): Derniers résultats par SIREN, du plus ancien au plus récent.
+        latences (dict): Derniers temps de chargement observés par page, en secondes.
+        seuil_abandon (int): Nombre d'échecs consécutifs à partir duquel un SIREN est ignoré
+            (0 pour ne jamais ignorer de dossier).
+    """
+
+    TAILLE_RESULTATS = 10
+    TAILLE_LATENCES = 200
+    ECHANTILLONS_MIN = 20
+    PERCENTILE = 95
+    MARGE = 2.0
+    # Le délai appris ne descend jamais sous cette fraction du délai par défaut
+    FRACTION_PLANCHER = 0.5
+
+    def __init__(self, chemin: str):
+        self.chemin = chemin
+        self.resultats: dict = {}
+        self.latences: dict = {}
+        self.seuil_abandon = lire_parametre("CFE_SEUIL_ABANDON", 0, int)
+        self._verrou = threading.Lock()
+        self.charger()
+
+    def charger(self):
+        """Charge l'historique depuis le disque s'il existe."""
+        if not os.path.exists(self.chemin):
+            return
+
+        try:
+            with open(self.chemin, "r", encoding="utf-8") as fichier:
+                contenu = json.load(fichier)
+        except (OSError, ValueError) as e:
+            logging.warning("Historique illisible, il sera recréé : %s", e)
+            return
+
+        self.resultats = contenu.get("resultats", {})
+        self.latences = contenu.get("latences", {})
+        logging.info("Historique chargé : %d SIREN, %d pages chronométrées.",
+                     len(self.resultats), len(self.latences))
+
+    def sauvegarder(self):
+        """Enregistre l'historique sur le disque."""
+        with self._verrou:
+            contenu = {"resultats": self.resultats, "latences": self.latences}
+            chemin_temporaire = f"{self.chemin}.tmp"
+            with open(chemin_temporaire, "w", encoding="utf-8") as fichier:
+                json.dump(contenu, fichier)
+            os.replace(chemin_temporaire, self.chemin)
+
+    def enregistrer_resultat(self, siren: str, resultat: str):
+        """
+        Enregistre le résultat du traitement d'un SIREN pour l'exécution en cours.
+
+        Args:
+            siren (str): Numéro SIREN traité.
+            resultat (str): 'SUCCES', 'SANS_DOCUMENT', 'PAS_DE_CFE' ou 'INACCESSIBLE'.
+        """
+        with self._verrou:
+            entree = self.resultats.setdefault(siren, {"resultats": []})
+            entree["resultats"] = (entree["resultats"] + [resultat])[-self.TAILLE_RESULTATS:]
+            entree["derniere_execution"] = date.today().isoformat()
+
+    def enregistrer_latence(self, page: str, duree: float):
+        """
+        Enregistre le temps de chargement observé pour une page.
+
+        Un délai d'attente dépassé est enregistré comme un échantillon valant le délai utilisé
+        (valeur censurée), afin que la distribution s'élargisse quand le portail ralentit.
+
+        Args:
+            page (str): Identifiant de la page ou de l'étape (ex. 'compte_fiscal').
+            duree (float): Temps de chargement, en secondes.
+        """
+        with self._verrou:
+            echantillons = self.latences.setdefault(page, [])
+            echantillons.append(round(duree, 3))
+            del echantillons[:-self.TAILLE_LATENCES]
+
+    def delai(self, page: str, defaut: float) -> float:
+        """
+        Retourne le délai d'attente à utiliser pour une page, calculé à partir du percentile
+        des temps de chargement observés et borné entre la moitié et trois fois le défaut.
+
+        Args:
+            page (str): Identifiant de la page ou de l'étape.
+            defaut (float): Délai utilisé tant que l'historique est insuffisant.
+
+        Returns:
+            float: Le délai d'attente, en secondes.
+        """
+        with self._verrou:
+            echantillons = sorted(self.latences.get(page, []))
+        if len(echantillons) < self.ECHANTILLONS_MIN:
+            return defaut
+
+        rang = min(len(echantillons) - 1, len(echantillons) * self.PERCENTILE // 100)
+        return min(max(echantillons[rang] * self.MARGE, defaut * self.FRACTION_PLANCHER),
+                   defaut * 3)
+
+    def taux_productif(self, siren: str) -> float:
+        """Estime la probabilité qu'un SIREN aboutisse, d'après ses résultats passés."""
+        resultats = self.resultats.get(siren, {}).get("resultats", [])
+        productifs = sum(resultat not in RESULTATS_IMPRODUCTIFS for resultat in resultats)
+        # Lissage de Laplace : un SIREN inconnu obtient 0.5
+        return (productifs + 1) / (len(resultats) + 2)
+
+    def est_abandonne(self, siren: str) -> bool:
+        """Indique si un SIREN a échoué lors des `seuil_abandon` dernières exécutions."""
+        if self.seuil_abandon <= 0:
+            return False
+        resultats = self.resultats.get(siren, {}).get("resultats", [])
+        derniers = resultats[-self.seuil_abandon:]
+        return (len(derniers) == self.seuil_abandon
+                and all(resultat in RESULTATS_IMPRODUCTIFS for resultat in derniers))
+
+    def ordonner(self, donnees: list) -> tuple:
+        """
+        Ordonne les dossiers pour traiter en premier ceux qui ont le plus de chances d'aboutir.
+
+        Args:
+            donnees (list): Liste de tuples dont le premier élément est le SIREN.
+
+        Returns:
+            tuple: La liste ordonnée des dossiers à traiter, et la liste des dossiers ignorés.
+        """
+        ignores = [dossier for dossier in donnees if self.est_abandonne(dossier[0])]
+        a_traiter = [dossier for dossier in donnees if not self.est_abandonne(dossier[0])]
+        a_traiter.sort(key=lambda dossier: -self.taux_productif(dossier[0]))
+        return a_traiter, ignores
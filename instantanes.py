@@ -0,0 +1,121 @@
+"""Tampon circulaire des derniers états de page, enregistré sur disque en cas d'échec."""
+import json
+import logging
+import os
+from collections import deque
+from datetime import datetime
+
+from configuration import lire_parametre
+
+DOSSIER_DIAGNOSTICS = "diagnostics"
+
+# Un seul aller-retour avec le navigateur : URL, titre et extrait compact du DOM. Le DOM est
+# tronqué avant de compacter les espaces pour ne pas parcourir toute la page.
+SCRIPT_EXTRAIT = """
+    const n = arguments[0];
+    const corps = document.body ? document.body.outerHTML.slice(0, 4 * n) : '';
+    return [window.location.href, document.title, corps.replace(/\\s+/g, ' ').slice(0, n)];
+"""
+
+
+class TamponInstantanes:
+    """
+    Conserve en mémoire les derniers états de page (URL, extrait du DOM et, en option, capture
+    d'écran) pris à chaque étape du traitement d'un dossier. Rien n'est écrit sur disque tant
+    qu'un dossier aboutit : le tampon n'est enregistré, avec les fenêtres alors ouvertes, que
+    pour les dossiers en échec ou anormalement lents.
+
+    Attributes:
+        dossier (str): Répertoire où sont enregistrés les diagnostics.
+        taille (int): Nombre d'états conservés (0 pour désactiver les captures).
+        captures_ecran (bool): Si True, une capture d'écran accompagne chaque état.
+        seuil_lenteur (float): Durée de traitement d'un dossier, en secondes, au-delà de
+            laquelle ses états sont enregistrés.
+    """
+
+    LONGUEUR_EXTRAIT = 2000
+
+    def __init__(self, dossier: str, taille: int = 20, captures_ecran: bool = False,
+                 seuil_lenteur: float = 60.0):
+        self.dossier = dossier
+        self.taille = taille
+        self.captures_ecran = captures_ecran
+        self.seuil_lenteur = seuil_lenteur
+        self._etats = deque(maxlen=max(taille, 1))
+
+    @classmethod
+    def depuis_environnement(cls, script_path: str):
+        """
+        Crée un tampon à partir des variables d'environnement CFE_INSTANTANES_TAILLE,
+        CFE_INSTANTANES_CAPTURES et CFE_INSTANTANES_SEUIL.
+        """
+        return cls(
+            os.path.join(script_path, DOSSIER_DIAGNOSTICS),
+            taille=lire_parametre("CFE_INSTANTANES_TAILLE", 20, int),
+            captures_ecran=lire_parametre("CFE_INSTANTANES_CAPTURES", 0, int) == 1,
+            seuil_lenteur=lire_parametre("CFE_INSTANTANES_SEUIL", 60.0),
+        )
+
+    def capturer(self, driver, etape: str):
+        """
+        Ajoute l'état courant du navigateur au tampon. Une capture ne doit jamais interrompre le
+        traitement : une erreur du navigateur est conservée à la place de l'état.
+
+        Args:
+            driver (webdriver.Firefox): Le navigateur de la session.
+            etape (str): Étape du traitement à laquelle l'état est pris.
+        """
+        if self.taille <= 0 or driver is None:
+            return
+
+        etat = {"horodatage": datetime.now().isoformat(timespec="milliseconds"), "etape": etape}
+        try:
+            etat["url"], etat["titre"], etat["extrait"] = driver.execute_script(
+                SCRIPT_EXTRAIT, self.LONGUEUR_EXTRAIT)
+            if self.captures_ecran:
+                etat["capture"] = driver.get_screenshot_as_png()
+        except Exception as e:
+            etat["erreur"] = str(e)
+        self._etats.append(etat)
+
+    def reinitialiser(self):
+        """Vide le tampon, à appeler au début du traitement de chaque dossier."""
+        self._etats.clear()
+
+    def vider(self, siren: str, motif: str, driver=None):
+        """
+        Enregistre le contenu du tampon sur disque, puis le vide.
+
+        Args:
+            siren (str): Numéro SIREN du dossier concerné.
+            motif (str): Raison de l'enregistrement (ex. 'INACCESSIBLE', 'LENT', 'ERREUR').
+            driver (webdriver.Firefox): Le navigateur de la session, dont les fenêtres ouvertes
+                sont relevées au moment de l'enregistrement.
+        """
+        if not self._etats:
+            return
+
+        fenetres = None
+        if driver is not None:
+            try:
+                fenetres = driver.window_handles
+            except Exception as e:
+                fenetres = str(e)
+
+        os.makedirs(self.dossier, exist_ok=True)
+        prefixe = os.path.join(self.dossier, f"{datetime.now():%Y%m%d_%H%M%S}_{siren}_{motif}")
+        etats = list(self._etats)
+        self._etats.clear()
+
+        for numero, etat in enumerate(etats):
+            capture = etat.pop("capture", None)
+            if capture:
+                etat["capture"] = f"{prefixe}_{numero}.png"
+                with open(etat["capture"], "wb") as fichier:
+                    fichier.write(capture)
+
+        with open(f"{prefixe}.json", "w", encoding="utf-8") as fichier:
+            json.dump({"siren": siren, "motif": motif, "fenetres": fenetres, "etats": etats},
+                      fichier, ensure_ascii=False, indent=2)
+        logging.info("Diagnostic enregistré : %s.json", prefixe,
+                     extra={"siren": siren, "resultat": motif})
@@ -0,0 +1,118 @@
+"""Journalisation non bloquante : file d'attente, écriture en tâche de fond et format JSON."""
+import glob
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime
+
+from configuration import lire_parametre
+
+DOSSIER_LOGS = "logs"
+# Champs structurés acceptés via l'argument `extra` des appels de journalisation
+CHAMPS_STRUCTURES = ("siren", "compte", "etape", "duree", "resultat")
+# Bibliothèques tierces dont les messages de débogage reprennent le contenu des requêtes,
+# mots de passe saisis compris : elles restent au niveau WARNING quel que soit CFE_LOGS_NIVEAU
+JOURNAUX_TIERS = ("selenium", "urllib3")
+
+
+class FormateurJson(logging.Formatter):
+    """Formate chaque enregistrement en une ligne JSON."""
+
+    def format(self, record):
+        entree = {
+            "horodatage": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "niveau": record.levelname,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for champ in CHAMPS_STRUCTURES:
+            if hasattr(record, champ):
+                entree[champ] = getattr(record, champ)
+        if record.exc_text:
+            entree["exception"] = record.exc_text
+        return json.dumps(entree, ensure_ascii=False)
+
+
+class GestionnaireFileAttente(logging.handlers.QueueHandler):
+    """
+    Dépose les enregistrements dans une file d'attente sans appliquer de formateur : le thread
+    appelant ne fait qu'assembler le message avec ses arguments et, le cas échéant, figer la
+    trace de l'exception avant que la pile ne change. La mise en forme JSON et l'écriture sur
+    disque sont laissées au thread d'écriture.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def purger_anciennes_executions(dossier: str, executions_conservees: int):
+    """
+    Supprime les fichiers de logs des exécutions les plus anciennes.
+
+    Args:
+        dossier (str): Répertoire des logs.
+        executions_conservees (int): Nombre d'exécutions dont les logs sont conservés.
+    """
+    executions = sorted(glob.glob(os.path.join(dossier, "cfe_*.jsonl")))
+    for fichier in executions[:-executions_conservees or None]:
+        for chemin in glob.glob(f"{fichier}*"):
+            os.remove(chemin)
+
+
+def configurer_journalisation(script_path: str) -> logging.handlers.QueueListener:
+    """
+    Route toute la journalisation à travers une file d'attente vidée par un thread d'écriture.
+
+    Chaque exécution écrit dans son propre fichier `logs/cfe_<date>.jsonl` (une ligne JSON par
+    enregistrement), découpé au-delà de CFE_LOGS_TAILLE_MO mégaoctets ; seules les
+    CFE_LOGS_EXECUTIONS dernières exécutions sont conservées. Les messages sont également
+    affichés sur la sortie standard.
+
+    Args:
+        script_path (str): Répertoire de l'application, où est créé le répertoire des logs.
+
+    Returns:
+        QueueListener: Le thread d'écriture, à arrêter en fin d'exécution pour vider la file.
+    """
+    dossier = os.path.join(script_path, DOSSIER_LOGS)
+    os.makedirs(dossier, exist_ok=True)
+    chemin = os.path.join(dossier, f"cfe_{datetime.now():%Y%m%d_%H%M%S}.jsonl")
+    # L'exécution en cours est toujours conservée
+    executions_conservees = max(lire_parametre("CFE_LOGS_EXECUTIONS", 10, int), 1)
+    purger_anciennes_executions(dossier, executions_conservees - 1)
+
+    gestionnaire_fichier = logging.handlers.RotatingFileHandler(
+        chemin, encoding="utf-8", backupCount=5,
+        maxBytes=lire_parametre("CFE_LOGS_TAILLE_MO", 10, int) * 1024 * 1024)
+    gestionnaire_fichier.setFormatter(FormateurJson())
+
+    gestionnaires = [gestionnaire_fichier]
+    # L'exécutable fenêtré n'a pas de sortie standard
+    if sys.stdout:
+        gestionnaire_console = logging.StreamHandler(sys.stdout)
+        gestionnaire_console.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
+        gestionnaires.append(gestionnaire_console)
+
+    file_attente = queue.SimpleQueue()
+    ecrivain = logging.handlers.QueueListener(
+        file_attente, *gestionnaires, respect_handler_level=True)
+
+    racine = logging.getLogger()
+    for gestionnaire in racine.handlers[:]:
+        racine.removeHandler(gestionnaire)
+    racine.addHandler(GestionnaireFileAttente(file_attente))
+    niveau = lire_parametre("CFE_LOGS_NIVEAU", "INFO", str).upper()
+    racine.setLevel(niveau if isinstance(logging.getLevelName(niveau), int) else logging.INFO)
+    for nom in JOURNAUX_TIERS:
+        logging.getLogger(nom).setLevel(logging.WARNING)
+
+    ecrivain.start()
+    return ecrivain
@@ -0,0 +1,121 @@
+"""Limiteur de débit global et adaptatif pour les requêtes vers le portail impots.gouv."""
+import logging
+import threading
+from time import monotonic, sleep
+
+from configuration import lire_parametre
+
+
+class LimiteurDebit:
+    """
+    Seau à jetons partagé par toutes les sessions, dont le débit s'adapte aux réponses du portail.
+
+    Le débit augmente de façon additive tant que les réponses restent rapides et sans erreur, et
+    diminue de façon multiplicative dès qu'une erreur, un timeout ou un ralentissement apparaît.
+
+    Attributes:
+        debit (float): Débit courant, en requêtes par seconde.
+        debit_min (float): Débit plancher, jamais franchi lors d'un ralentissement.
+        debit_max (float): Débit plafond, jamais dépassé lors d'une accélération.
+        capacite (float): Nombre maximal de jetons accumulables (rafale autorisée).
+        seuil_lenteur (float): Durée de réponse, en secondes, au-delà de laquelle le portail est
+            considéré comme ralenti.
+    """
+
+    INCREMENT = 0.05
+    FACTEUR_REDUCTION = 0.5
+    # Plancher absolu du débit : un débit nul bloquerait indéfiniment les sessions
+    DEBIT_PLANCHER = 0.01
+
+    def __init__(self, debit_initial: float = 1.0, debit_min: float = 0.2,
+                 debit_max: float = 3.0, capacite: float = 2.0, seuil_lenteur: float = 5.0):
+        self.debit_min = max(debit_min, self.DEBIT_PLANCHER)
+        self.debit_max = max(debit_max, self.debit_min)
+        self.debit = min(max(debit_initial, self.debit_min), self.debit_max)
+        self.capacite = max(capacite, 1.0)
+        self.seuil_lenteur = seuil_lenteur
+        self._jetons = 1.0
+        self._dernier_remplissage = monotonic()
+        self._verrou = threading.Lock()
+        self.statistiques: dict = {"requetes": 0, "succes": 0, "echecs": 0, "lenteurs": 0}
+
+        logging.info("Limiteur de débit : initial %.2f req/s, min %.2f req/s, max %.2f req/s, "
+                     "rafale %.0f, seuil de lenteur %.1f s", self.debit, self.debit_min,
+                     self.debit_max, self.capacite, self.seuil_lenteur)
+
+    @classmethod
+    def depuis_environnement(cls):
+        """
+        Crée un limiteur à partir des variables d'environnement CFE_DEBIT_INITIAL,
+        CFE_DEBIT_MIN, CFE_DEBIT_MAX, CFE_DEBIT_RAFALE et CFE_SEUIL_LENTEUR.
+        """
+        return cls(
+            debit_initial=lire_parametre("CFE_DEBIT_INITIAL", 1.0),
+            debit_min=lire_parametre("CFE_DEBIT_MIN", 0.2),
+            debit_max=lire_parametre("CFE_DEBIT_MAX", 3.0),
+            capacite=lire_parametre("CFE_DEBIT_RAFALE", 2.0),
+            seuil_lenteur=lire_parametre("CFE_SEUIL_LENTEUR", 5.0),
+        )
+
+    def _remplir(self):
+        """Ajoute les jetons accumulés depuis le dernier remplissage."""
+        maintenant = monotonic()
+        self._jetons = min(self.capacite,
+                           self._jetons + (maintenant - self._dernier_remplissage) * self.debit)
+        self._dernier_remplissage = maintenant
+
+    def acquerir(self):
+        """Bloque jusqu'à ce qu'un jeton soit disponible, puis le consomme."""
+        while True:
+            with self._verrou:
+                self._remplir()
+                if self._jetons >= 1:
+                    self._jetons -= 1
+                    self.statistiques["requetes"] += 1
+                    return
+                attente = (1 - self._jetons) / self.debit
+            sleep(attente)
+
+    def signaler_succes(self, duree: float):
+        """
+        Signale une réponse réussie. Le débit augmente si la réponse a été rapide, et diminue
+        si elle a dépassé le seuil de lenteur.
+
+        Args:
+            duree (float): Durée de la réponse, en secondes.
+        """
+        if duree > self.seuil_lenteur:
+            with self._verrou:
+                self.statistiques["lenteurs"] += 1
+            self._ralentir(f"réponse lente ({duree:.1f} s)")
+            return
+
+        with self._verrou:
+            self.statistiques["succes"] += 1
+            self.debit = min(self.debit_max, self.debit + self.INCREMENT)
+        logging.debug("Limiteur de débit : accélération à %.2f req/s", self.debit)
+
+    def signaler_echec(self, motif: str):
+        """
+        Signale une erreur ou un timeout du portail, ce qui réduit le débit.
+
+        Args:
+            motif (str): Description de l'échec, reprise dans les logs.
+        """
+        with self._verrou:
+            self.statistiques["echecs"] += 1
+        self._ralentir(motif)
+
+    def _ralentir(self, motif: str):
+        """Réduit le débit de façon multiplicative sans descendre sous le plancher."""
+        with self._verrou:
+            self.debit = max(self.debit_min, self.debit * self.FACTEUR_REDUCTION)
+            self._jetons = min(self._jetons, 0.0)
+        logging.warning("Limiteur de débit : ralentissement à %.2f req/s (%s)", self.debit, motif)
+
+    def journaliser_resume(self):
+        """Journalise le débit final et les statistiques de la session."""
+        logging.info("Limiteur de débit : débit final %.2f req/s | Requêtes: %d | Succès: %d | "
+                     "Échecs: %d | Lenteurs: %d", self.debit, self.statistiques["requetes"],
+                     self.statistiques["succes"], self.statistiques["echecs"],
+                     self.statistiques["lenteurs"])
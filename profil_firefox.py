@@ -0,0 +1,154 @@
+"""Profil Firefox persistant, réutilisé d'une exécution à l'autre pour conserver son cache."""
+import logging
+import os
+import re
+
+from configuration import lire_parametre
+
+DOSSIER_PROFILS = "profils_firefox"
+
+
+class ProfilPersistant:
+    """
+    Répertoire de profil Firefox géré par l'application, conservé entre les exécutions afin que
+    le cache HTTP et les préférences soient déjà en place au démarrage.
+
+    Un verrou système garantit qu'un seul navigateur utilise le profil à la fois : il est libéré
+    automatiquement par le système si l'application s'arrête brutalement.
+
+    Attributes:
+        chemin (str): Chemin du répertoire du profil.
+        taille_cache_max (int): Taille maximale du cache disque, en octets.
+    """
+
+    FICHIER_VERROU = "cfe.lock"
+    # Taille visée après une purge, en proportion de la taille maximale
+    RATIO_PURGE = 0.8
+
+    def __init__(self, chemin: str, taille_cache_max_mo: int = 200):
+        self.chemin = chemin
+        self.taille_cache_max = taille_cache_max_mo * 1024 * 1024
+        self._descripteur_verrou = None
+
+    @classmethod
+    def depuis_environnement(cls, script_path: str, nom: str):
+        """
+        Crée le profil persistant nommé `nom` si l'option CFE_PROFIL_PERSISTANT est activée.
+
+        CFE_PROFIL_PERSISTANT vaut '1' pour utiliser le répertoire `profils_firefox` situé à côté
+        de l'exécutable, ou le chemin d'un autre répertoire. CFE_PROFIL_CACHE_MO fixe la taille
+        maximale du cache disque, en mégaoctets.
+
+        Returns:
+            ProfilPersistant: Le profil, ou None si l'option est désactivée.
+        """
+        option = lire_parametre("CFE_PROFIL_PERSISTANT", "", str)
+        if option in ("", "0"):
+            return None
+
+        racine = os.path.join(script_path, DOSSIER_PROFILS) if option == "1" else option
+        nom_dossier = re.sub(r"[^\w.-]", "_", nom)
+        return cls(os.path.join(racine, nom_dossier),
+                   lire_parametre("CFE_PROFIL_CACHE_MO", 200, int))
+
+    def reserver(self) -> bool:
+        """
+        Réserve le profil pour la session en cours.
+
+        Returns:
+            bool: True si le profil est réservé, False s'il est déjà utilisé par une autre session.
+        """
+        os.makedirs(self.chemin, exist_ok=True)
+        descripteur = os.open(os.path.join(self.chemin, self.FICHIER_VERROU),
+                              os.O_RDWR | os.O_CREAT)
+        try:
+            if os.name == "nt":
+                import msvcrt  # pylint: disable=import-outside-toplevel
+                msvcrt.locking(descripteur, msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl  # pylint: disable=import-outside-toplevel
+                fcntl.flock(descripteur, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(descripteur)
+            logging.warning("Profil Firefox déjà utilisé par une autre session : %s", self.chemin)
+            return False
+
+        self._descripteur_verrou = descripteur
+        return True
+
+    def liberer(self):
+        """Libère le profil pour les sessions suivantes."""
+        if self._descripteur_verrou is None:
+            return
+
+        if os.name == "nt":
+            import msvcrt  # pylint: disable=import-outside-toplevel
+            os.lseek(self._descripteur_verrou, 0, os.SEEK_SET)
+            msvcrt.locking(self._descripteur_verrou, msvcrt.LK_UNLCK, 1)
+        os.close(self._descripteur_verrou)
+        self._descripteur_verrou = None
+
+    def preferences_cache(self) -> dict:
+        """Retourne les préférences qui plafonnent le cache disque de Firefox."""
+        return {
+            "browser.cache.disk.enable": True,
+            "browser.cache.disk.smart_size.enabled": False,
+            "browser.cache.disk.capacity": self.taille_cache_max // 1024,
+        }
+
+    def ecrire_preferences(self, preferences: dict):
+        """
+        Enregistre les préférences dans le fichier `user.js` du profil, relu par Firefox à chaque
+        démarrage.
+
+        Args:
+            preferences (dict): Préférences Firefox (nom : valeur).
+        """
+        lignes = []
+        for nom, valeur in preferences.items():
+            if isinstance(valeur, bool):
+                valeur = "true" if valeur else "false"
+            elif isinstance(valeur, str):
+                valeur = '"' + valeur.replace("\\", "\\\\").replace('"', '\\"') + '"'
+            lignes.append(f'user_pref("{nom}", {valeur});\n')
+
+        with open(os.path.join(self.chemin, "user.js"), "w", encoding="utf-8") as fichier:
+            fichier.writelines(lignes)
+
+    def purger_cache(self):
+        """
+        Supprime les entrées les plus anciennes du cache disque lorsque celui-ci dépasse la taille
+        maximale. À appeler avant le démarrage du navigateur.
+        """
+        dossier_cache = os.path.join(self.chemin, "cache2")
+        dossier_entrees = os.path.join(dossier_cache, "entries")
+        if not os.path.isdir(dossier_entrees):
+            return
+
+        entrees = []
+        for entree in os.scandir(dossier_entrees):
+            if entree.is_file():
+                infos = entree.stat()
+                entrees.append((infos.st_mtime, infos.st_size, entree.path))
+
+        taille = sum(taille_entree for _, taille_entree, _ in entrees)
+        if taille <= self.taille_cache_max:
+            return
+
+        cible = self.taille_cache_max * self.RATIO_PURGE
+        supprimees = 0
+        for _, taille_entree, chemin in sorted(entrees):
+            if taille <= cible:
+                break
+            os.remove(chemin)
+            taille -= taille_entree
+            supprimees += 1
+
+        # L'index ne correspond plus aux entrées : Firefox le reconstruit au démarrage
+        for nom_index in ("index", "index.log"):
+            try:
+                os.remove(os.path.join(dossier_cache, nom_index))
+            except FileNotFoundError:
+                pass
+        logging.info("Cache du profil Firefox purgé : %d entrées supprimées, %.0f Mo restants.",
+                     supprimees, taille / (1024 * 1024))
@@ -0,0 +1,171 @@
+"""Profilage par échantillonnage des piles et instantanés mémoire, activables en production."""
+import logging
+import os
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from time import monotonic
+
+from configuration import lire_parametre
+
+DOSSIER_PROFILAGE = "profilage"
+# Threads profilés : l'interface, le thread de traitement et les sessions de chaque compte
+THREADS_PROFILES = ("MainThread", "traitement", "compte_")
+
+
+class Profileur:
+    """
+    Échantillonne à intervalle régulier la pile d'appels des threads de l'application et prend
+    périodiquement un instantané `tracemalloc` de la mémoire allouée.
+
+    L'échantillonnage mesure le temps écoulé (« wall-clock ») et non le temps CPU : un thread
+    bloqué (boucle Tk au repos, attente d'une réponse de Selenium, `sleep`) est compté comme
+    s'il travaillait, dans la fonction où il attend.
+
+    Les résultats sont écrits dans un répertoire propre à l'exécution, et les piles réécrites à
+    chaque instantané mémoire pour survivre à un arrêt forcé du programme :
+        - `temps_ecoule.folded` : piles d'appels agrégées au format « folded », une ligne par
+          pile (`thread;fonction;...;fonction nombre`), exploitable par flamegraph.pl ou
+          speedscope ;
+        - `temps_ecoule_resume.txt` : les fonctions en sommet de pile le plus souvent, par
+          thread, attentes comprises ;
+        - `memoire_<n>.txt` : les lignes qui allouent le plus, et leur évolution depuis le
+          premier instantané.
+
+    Attributes:
+        dossier (str): Répertoire des résultats de l'exécution.
+        intervalle_echantillonnage (float): Intervalle entre deux échantillons, en secondes.
+        intervalle_memoire (float): Intervalle entre deux instantanés mémoire, en secondes.
+    """
+
+    NOMBRE_LIGNES = 25
+    # Intervalle minimal d'échantillonnage : en dessous, le thread tournerait à vide
+    INTERVALLE_MIN = 0.001
+    PROFONDEUR_TRACEMALLOC = 5
+
+    def __init__(self, dossier: str, intervalle_echantillonnage: float = 0.01,
+                 intervalle_memoire: float = 60.0):
+        self.dossier = dossier
+        self.intervalle_echantillonnage = max(intervalle_echantillonnage, self.INTERVALLE_MIN)
+        self.intervalle_memoire = intervalle_memoire
+        self.piles: Counter = Counter()
+        self._arret = threading.Event()
+        self._thread = None
+        self._premier_instantane = None
+        self._nombre_instantanes = 0
+
+    @classmethod
+    def depuis_environnement(cls, script_path: str, active: bool = False):
+        """
+        Crée un profileur si le profilage est demandé par l'option --profilage ou par la variable
+        d'environnement CFE_PROFILAGE=1. Les intervalles sont lus dans CFE_PROFILAGE_INTERVALLE_MS
+        et CFE_PROFILAGE_MEMOIRE_S.
+
+        Returns:
+            Profileur: Le profileur, ou None si le profilage n'est pas demandé.
+        """
+        if not active and lire_parametre("CFE_PROFILAGE", 0, int) != 1:
+            return None
+
+        return cls(
+            os.path.join(script_path, DOSSIER_PROFILAGE, f"{datetime.now():%Y%m%d_%H%M%S}"),
+            intervalle_echantillonnage=lire_parametre("CFE_PROFILAGE_INTERVALLE_MS", 10) / 1000,
+            intervalle_memoire=lire_parametre("CFE_PROFILAGE_MEMOIRE_S", 60.0),
+        )
+
+    def demarrer(self):
+        """Démarre le suivi mémoire et le thread d'échantillonnage."""
+        os.makedirs(self.dossier, exist_ok=True)
+        tracemalloc.start(self.PROFONDEUR_TRACEMALLOC)
+        self._thread = threading.Thread(target=self._echantillonner, name="profilage",
+                                        daemon=True)
+        self._thread.start()
+        logging.info("Profilage activé (échantillon toutes les %.0f ms, mémoire toutes les "
+                     "%.0f s) : %s", self.intervalle_echantillonnage * 1000,
+                     self.intervalle_memoire, self.dossier)
+
+    def arreter(self):
+        """Arrête le profilage et écrit les résultats sur disque."""
+        if self._thread is None:
+            return
+
+        self._arret.set()
+        self._thread.join()
+        self._thread = None
+        self.instantane_memoire()
+        tracemalloc.stop()
+        self._ecrire_piles()
+        logging.info("Résultats du profilage enregistrés : %s", self.dossier)
+
+    def _echantillonner(self):
+        """Boucle du thread d'échantillonnage."""
+        prochain_instantane = monotonic() + self.intervalle_memoire
+        while not self._arret.wait(self.intervalle_echantillonnage):
+            noms = {thread.ident: thread.name for thread in threading.enumerate()}
+            for identifiant, frame in sys._current_frames().items():  # pylint: disable=W0212
+                nom = noms.get(identifiant, "")
+                if nom.startswith(THREADS_PROFILES):
+                    self.piles[(nom,) + self._pile(frame)] += 1
+
+            if monotonic() >= prochain_instantane:
+                self.instantane_memoire()
+                self._ecrire_piles()
+                prochain_instantane = monotonic() + self.intervalle_memoire
+
+    @staticmethod
+    def _pile(frame) -> tuple:
+        """Retourne la pile d'appels d'une frame, de l'appel le plus externe au plus interne."""
+        pile = []
+        while frame is not None:
+            code = frame.f_code
+            pile.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+            frame = frame.f_back
+        return tuple(reversed(pile))
+
+    def instantane_memoire(self):
+        """Écrit les lignes qui allouent le plus de mémoire et leur évolution."""
+        if not tracemalloc.is_tracing():
+            return
+
+        instantane = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),))
+        if self._premier_instantane is None:
+            self._premier_instantane = instantane
+        self._nombre_instantanes += 1
+
+        actuel, pic = tracemalloc.get_traced_memory()
+        chemin = os.path.join(self.dossier, f"memoire_{self._nombre_instantanes}.txt")
+        with open(chemin, "w", encoding="utf-8") as fichier:
+            fichier.write(f"Mémoire suivie : {actuel / 1024:.0f} Kio (pic {pic / 1024:.0f} Kio)"
+                          "\n\nPlus grosses allocations :\n")
+            for statistique in instantane.statistics("lineno")[:self.NOMBRE_LIGNES]:
+                fichier.write(f"{statistique}\n")
+            fichier.write("\nÉvolution depuis le premier instantané :\n")
+            for statistique in instantane.compare_to(
+                    self._premier_instantane, "lineno")[:self.NOMBRE_LIGNES]:
+                fichier.write(f"{statistique}\n")
+
+    def _ecrire_piles(self):
+        """Écrit les piles agrégées et le résumé des fonctions les plus échantillonnées."""
+        with open(os.path.join(self.dossier, "temps_ecoule.folded"), "w",
+                  encoding="utf-8") as fichier:
+            for pile, nombre in self.piles.most_common():
+                fichier.write(f"{';'.join(pile)} {nombre}\n")
+
+        # Fonction en sommet de pile lors de l'échantillon, qu'elle calcule ou qu'elle attende
+        par_thread: dict = {}
+        for pile, nombre in self.piles.items():
+            par_thread.setdefault(pile[0], Counter())[pile[-1]] += nombre
+
+        with open(os.path.join(self.dossier, "temps_ecoule_resume.txt"), "w",
+                  encoding="utf-8") as fichier:
+            fichier.write("Temps écoulé par fonction en sommet de pile (attentes et blocages "
+                          "compris, ce n'est pas du temps CPU)\n\n")
+            for nom, fonctions in sorted(par_thread.items()):
+                total = sum(fonctions.values())
+                fichier.write(f"Thread {nom} : {total} échantillons\n")
+                for fonction, nombre in fonctions.most_common(self.NOMBRE_LIGNES):
+                    fichier.write(f"  {nombre / total:6.1%}  {fonction}\n")
+                fichier.write("\n")
@@ -1,4 +1,5 @@
 """Programme de recuperation des CFE."""
+import argparse
 import glob
 import logging
 import os
@@ -7,22 +8,53 @@ import sys
 import threading
 import tkinter
 from datetime import datetime
-from itertools import islice
-from time import sleep
+from time import monotonic
 from tkinter import messagebox
 
-
-from selenium import webdriver
-from selenium.common.exceptions import TimeoutException, WebDriverException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
-
 from cfe_tkinter import WindowApp
+from historique import Historique
+from instantanes import TamponInstantanes
+from journalisation import configurer_journalisation
+from limiteur_debit import LimiteurDebit
+from profilage import Profileur
+from profil_firefox import ProfilPersistant
 
 LIEN_IMPOTS = "https://cfspro.impots.gouv.fr/mire/accueil.do"
 
+# Selenium est importé à la demande par importer_selenium() afin que la fenêtre s'affiche
+# sans attendre le chargement du pilote
+webdriver = TimeoutException = WebDriverException = By = FirefoxOptions = EC = WebDriverWait = None
+
+# Les captchas de connexion sont saisis un compte après l'autre
+VERROU_CONNEXION = threading.Lock()
+# Nombre de tentatives de connexion (captcha compris) avant d'abandonner un compte
+TENTATIVES_CONNEXION = 3
+# Tkinter n'est pas thread-safe : une seule session met à jour la fenêtre à la fois
+VERROU_INTERFACE = threading.Lock()
+
+
+def importer_selenium():
+    """
+    Importe Selenium et renseigne les noms utilisés par le module. Sans effet si Selenium est
+    déjà importé.
+    """
+    # pylint: disable=global-statement, import-outside-toplevel, invalid-name
+    global webdriver, TimeoutException, WebDriverException, By, FirefoxOptions, EC, WebDriverWait
+    if WebDriverWait is not None:
+        return
+
+    from selenium import webdriver as module_webdriver
+    from selenium.common.exceptions import TimeoutException as ExceptionTimeout
+    from selenium.common.exceptions import WebDriverException as ExceptionWebDriver
+    from selenium.webdriver.common.by import By as ModuleBy
+    from selenium.webdriver.firefox.options import Options
+    from selenium.webdriver.support import expected_conditions
+    from selenium.webdriver.support.ui import WebDriverWait as Attente
+
+    webdriver, TimeoutException, WebDriverException = (module_webdriver, ExceptionTimeout,
+                                                       ExceptionWebDriver)
+    By, FirefoxOptions, EC, WebDriverWait = ModuleBy, Options, expected_conditions, Attente
+
 
 class Program:
     """
@@ -38,6 +70,12 @@ class Program:
         credentials_file (str): The path to the file containing the login credentials.
         data (list): A list of tuples containing the SIREN numbers, company names, and dossier
         numbers.
+        limiteur (LimiteurDebit): Global adaptive rate limiter shared by every navigation and
+        download.
+        historique (Historique): Per-SIREN outcome history and per-page latency distributions
+        kept across runs.
+        instantanes (TamponInstantanes): Ring buffer of the last page states, written to disk
+        for failed or slow dossiers only.
 
     Methods:
         __init__ (self): Initializes the Program instance.
@@ -57,22 +95,31 @@ class Program:
         avis de CFE and processing the avis imposition link.
     """
 
-    def __init__(self):
+    def __init__(self, limiteur: LimiteurDebit = None, historique: Historique = None):
         self.script_path = os.path.dirname(os.path.abspath(sys.argv[0]))
         self.credentials_file = os.path.join(self.script_path, "identifiants.txt")
         self.donnees: dict = {}
         self.driver = None
+        self.dossier_telechargement = None
+        self.profil = None
+        self.resultat = None
+        self.debut_navigation = None
+        self.instantanes = TamponInstantanes.depuis_environnement(self.script_path)
+        self.limiteur = limiteur or LimiteurDebit.depuis_environnement()
+        self.historique = historique or Historique(
+            os.path.join(self.script_path, "historique_cfe.json"))
         self.avancee: dict = {"dossiers_total": len(self.donnees), "dossiers_traites": 0,
                               "dossiers_succes": 0, "dossiers_echec": 0,
                               "dossiers_restants": len(self.donnees)}
-        print("Initialisation terminée.")
         logging.info("Initialisation terminée.")
 
     def __del__(self):
         if self.driver:
             self.driver.quit()
+        if self.profil:
+            self.profil.liberer()
 
-    def initialiser_driver(self, chemin_dossier: str):
+    def initialiser_driver(self, chemin_dossier: str, nom_profil: str = "defaut"):
         """
         Initialise et retourne un objet Selenium WebDriver pour Firefox avec des options
         spécifiques.
@@ -87,9 +134,15 @@ class Program:
                 - Cacher le gestionnaire de téléchargement au démarrage
                 - Ne jamais demander de sauvegarder les fichiers avec le type MIME application/pdf
                 - Désactiver PDF.js
+
+        Si l'option CFE_PROFIL_PERSISTANT est activée, le navigateur utilise le profil persistant
+        `nom_profil`, dont le cache et les préférences sont conservés d'une exécution à l'autre.
+        Si ce profil est déjà utilisé par une autre session, un profil temporaire est utilisé.
         """
         # Définir le répertoire de téléchargement dans le dossier "Documents"
         dossier_actuel = chemin_dossier
+        self.dossier_telechargement = dossier_actuel
+        os.makedirs(dossier_actuel, exist_ok=True)
 
         # Initialisation des options Firefox
         options_firefox = FirefoxOptions()
@@ -99,40 +152,151 @@ class Program:
         options_firefox.add_argument("--disable-dev-shm-usage")
 
         # Préférences de téléchargement
-        options_firefox.set_preference("browser.download.folderList", 2)
-        options_firefox.set_preference("browser.download.manager.showWhenStarting", False)
-        options_firefox.set_preference("browser.download.dir", dossier_actuel)
-        options_firefox.set_preference("browser.helperApps.neverAsk.saveToDisk", "application/pdf")
-        options_firefox.set_preference("pdfjs.disabled", True)
+        preferences = {
+            "browser.download.folderList": 2,
+            "browser.download.manager.showWhenStarting": False,
+            "browser.download.dir": dossier_actuel,
+            "browser.helperApps.neverAsk.saveToDisk": "application/pdf",
+            "pdfjs.disabled": True,
+        }
+
+        # Profil persistant : cache HTTP conservé, plafonné, et préférences enregistrées
+        profil = ProfilPersistant.depuis_environnement(self.script_path, nom_profil)
+        if profil and profil.reserver():
+            self.profil = profil
+            preferences.update(profil.preferences_cache())
+            profil.purger_cache()
+            profil.ecrire_preferences(preferences)
+            options_firefox.add_argument("-profile")
+            options_firefox.add_argument(profil.chemin)
+            logging.info("Utilisation du profil Firefox persistant : %s", profil.chemin)
+
+        for nom, valeur in preferences.items():
+            options_firefox.set_preference(nom, valeur)
 
         # Retourner le driver Firefox configuré
         self.driver = webdriver.Firefox(options=options_firefox)
 
+    def naviguer(self, action, *args):
+        """
+        Exécute une action de navigation ou de téléchargement au rythme du limiteur de débit,
+        et lui signale l'échec rencontré. La durée de la réponse est signalée par `attendre()`
+        une fois la page suivante chargée, un clic rendant la main avant le chargement.
+
+        Args:
+            action (callable): Action Selenium à exécuter (ex. `self.driver.get`, `lien.click`).
+            *args: Arguments transmis à l'action.
+
+        Returns:
+            Le résultat de l'action.
+        """
+        self.limiteur.acquerir()
+        self.debut_navigation = monotonic()
+        try:
+            return action(*args)
+        except TimeoutException:
+            self.limiteur.signaler_echec("timeout")
+            raise
+        except WebDriverException as e:
+            self.limiteur.signaler_echec(f"erreur du navigateur : {e.msg}")
+            raise
+
+    def attendre(self, page: str, condition, delai_defaut: float,
+                 absence_possible: bool = False, instantane: bool = True):
+        """
+        Attend qu'une condition soit remplie avec un délai calculé à partir des temps de
+        chargement déjà observés pour cette page, enregistre le temps constaté et conserve
+        l'état de la page dans le tampon de diagnostic. Le temps écoulé depuis la dernière
+        navigation est signalé au limiteur de débit.
+
+        Args:
+            page (str): Identifiant de la page ou de l'étape attendue.
+            condition: Condition `expected_conditions` à attendre.
+            delai_defaut (float): Délai utilisé tant que l'historique de la page est insuffisant.
+            absence_possible (bool): True si un délai dépassé est un résultat normal (élément
+                absent de la page) et non un ralentissement : il n'est alors pas enregistré, et
+                le délai appris ne peut qu'allonger le délai par défaut, jamais le raccourcir.
+            instantane (bool): False pour ne pas conserver l'état de la page dans le tampon.
+
+        Returns:
+            Le résultat de la condition.
+
+        Raises:
+            TimeoutException: Si la condition n'est pas remplie dans le délai imparti.
+        """
+        debut = monotonic()
+        delai = self.historique.delai(page, delai_defaut)
+        if absence_possible:
+            # Seules les présences sont chronométrées : un délai raccourci classerait une page
+            # un peu lente comme un dossier sans document
+            delai = max(delai, delai_defaut)
+        try:
+            resultat = WebDriverWait(self.driver, delai).until(condition)
+        except TimeoutException:
+            if not absence_possible:
+                self.historique.enregistrer_latence(page, delai)
+            raise
+        else:
+            duree = monotonic() - debut
+            self.historique.enregistrer_latence(page, duree)
+            if self.debut_navigation is not None:
+                self.limiteur.signaler_succes(monotonic() - self.debut_navigation)
+                self.debut_navigation = None
+        finally:
+            # L'état est pris après la mesure pour ne pas compter la capture dans la latence
+            if instantane:
+                self.instantanes.capturer(self.driver, page)
+        logging.debug("Page chargée : %s", page, extra={"etape": page, "duree": round(duree, 3)})
+        return resultat
+
+    def noter_resultat(self, siren: str, resultat: str):
+        """
+        Retient le résultat du traitement du SIREN en cours et l'enregistre dans l'historique.
+
+        Args:
+            siren (str): Numéro SIREN traité.
+            resultat (str): 'SUCCES', 'SANS_DOCUMENT', 'PAS_DE_CFE' ou 'INACCESSIBLE'.
+        """
+        self.resultat = resultat
+        self.historique.enregistrer_resultat(siren, resultat)
+
     def lire_identifiants(self):
         """
-        Lit les identifiants depuis le fichier et les retourne sous forme de liste.
+        Lit les comptes professionnels depuis le fichier d'identifiants, où chaque compte occupe
+        deux lignes : l'identifiant puis le mot de passe. Les lignes vides sont ignorées.
 
         Retourne :
-            list: Une liste contenant les deux premières lignes du fichier `identifiants_file`,
-            avec les espaces blancs en début et fin de ligne supprimés.
+            list: Une liste de tuples (identifiant, mot_de_passe), un par compte.
+
+        Raises:
+            ValueError: Si le fichier contient un nombre impair de lignes : une ligne manquante
+                décalerait toutes les paires suivantes.
         """
         with open(self.credentials_file, "r", encoding="utf-8") as fichier:
-            # Utilisation de islice pour limiter à 2 lignes.
-            return [ligne.strip() for ligne in islice(fichier, 2)]
+            lignes = [ligne.strip() for ligne in fichier if ligne.strip()]
+        if len(lignes) % 2:
+            # Le contenu des lignes n'est jamais journalisé : ce peut être un mot de passe
+            raise ValueError(f"Le fichier {os.path.basename(self.credentials_file)} contient "
+                             f"un nombre impair de lignes ({len(lignes)}) : chaque compte "
+                             "doit occuper deux lignes, l'identifiant puis le mot de passe.")
+        return list(zip(lignes[::2], lignes[1::2]))
 
     def lire_donnees(self, chemin: str) -> list:
         """
         Lit les données depuis un fichier et retourne une liste de tuples contenant le SIREN,
-        le nom de l'entreprise et le numéro de dossier.
+        le nom de l'entreprise, le numéro de dossier et, si la colonne est renseignée,
+        l'identifiant du compte professionnel à utiliser.
 
         Retourne :
             list: Une liste de tuples, chaque tuple contenant le SIREN (str),
-            le nom de l'entreprise (str) et le numéro de dossier (str).
+            le nom de l'entreprise (str), le numéro de dossier (str) et le compte (str, vide
+            si la ligne n'en précise pas).
         """
         with open(chemin, "r", encoding="utf-8") as fichier:
             return [
-                tuple(ligne.strip().split(";", 3)[:3])
-                for ligne in fichier if len(ligne.strip().split(";", 3)) == 3
+                tuple(champs + [""] * (4 - len(champs)))
+                for champs in (ligne.strip().split(";") for ligne in fichier)
+                if len(champs) in (3, 4)
             ]
 
     def afficher_warning(self):
@@ -168,11 +332,33 @@ class Program:
         The login process involves finding the username and password input fields on the website,
         entering the credentials from `self.creds`, and clicking the login button.
 
+        The captcha step is serialised across accounts with `VERROU_CONNEXION`, which is released
+        between attempts so that other accounts can log in while this one retries.
+
         Parameters:
             self (Program): The Program instance.
+
+        Raises:
+            TimeoutException: If the login still fails after `TENTATIVES_CONNEXION` attempts.
+        """
+        for tentative in range(1, TENTATIVES_CONNEXION + 1):
+            with VERROU_CONNEXION:
+                if self.tenter_connexion(identifiant, mot_de_passe):
+                    return
+            logging.error("Timeout lors de la connexion (tentative %d/%d).",
+                          tentative, TENTATIVES_CONNEXION)
+        raise TimeoutException(f"Connexion impossible pour le compte {identifiant}.")
+
+    def tenter_connexion(self, identifiant: str, mot_de_passe: str) -> bool:
+        """
+        Ouvre la page de connexion, saisit les identifiants et attend que l'utilisateur
+        remplisse le captcha.
+
+        Returns:
+            bool: True si la connexion a abouti, False si le délai d'attente est dépassé.
         """
-        print("Ouverture de la page...")
-        self.driver.get(LIEN_IMPOTS)
+        logging.info("Ouverture de la page...")
+        self.naviguer(self.driver.get, LIEN_IMPOTS)
 
         # Connexion
         self.driver.find_element(By.ID, "ident").send_keys(identifiant)
@@ -195,9 +381,8 @@ class Program:
         try:
             WebDriverWait(self.driver, 120).until(EC.url_to_be(LIEN_IMPOTS))
         except TimeoutException:
-            print("Timeout lors de la connexion. ")
-            logging.error("Timeout lors de la connexion.")
-            self.connexion_site(identifiant, mot_de_passe)
+            return False
+        return True
 
     def traiter_siren(self, siren: str, nom_entreprise: str, code_dossier: str):
         """
@@ -209,13 +394,32 @@ class Program:
             nom_entreprise (str): Nom de l'entreprise.
             code_dossier (str): Code de dossier associé.
         """
+        debut = monotonic()
+        self.resultat = None
+        self.instantanes.reinitialiser()
+
         # Je tente d'accéder à la page des avis CFE
         # Si elle est présente et contient des avis, je passe à l'étape du téléchargement
-        succes = self.acceder_avis_cfe_du_siren(siren)
-        if succes:
-            self.traiter_lien_avis_imposition(code_dossier, nom_entreprise, siren)
+        try:
+            succes = self.acceder_avis_cfe_du_siren(siren)
+            if succes:
+                self.traiter_lien_avis_imposition(code_dossier, nom_entreprise, siren)
+        except Exception:
+            self.instantanes.vider(siren, "ERREUR", self.driver)
+            raise
         maj_avancee(self, echec=not succes)
 
+        duree = monotonic() - debut
+        logging.info("Dossier traité - SIREN - %s - %s", siren, self.resultat,
+                     extra={"siren": siren, "etape": "fin", "resultat": self.resultat,
+                            "duree": round(duree, 3)})
+
+        # Les états de page ne sont écrits sur disque que pour les dossiers en échec ou lents
+        if self.resultat in ("INACCESSIBLE", "SANS_DOCUMENT"):
+            self.instantanes.vider(siren, self.resultat, self.driver)
+        elif duree > self.instantanes.seuil_lenteur:
+            self.instantanes.vider(siren, "LENT", self.driver)
+
     def acceder_avis_cfe_du_siren(self, siren):
         """
         Ouvre la page des Avis CFE et entre le numéro SIREN pour accéder aux informations CFE.
@@ -228,9 +432,16 @@ class Program:
         """
         # Clique pour accéder à la page de saisie de SIREN
         try:
-            WebDriverWait(self.driver, 10).until(EC.element_to_be_clickable(
-                (By.XPATH, "//a[normalize-space()='Avis CFE']"))).click()
-        except (TimeoutException, WebDriverException):
+            lien_avis = self.attendre("lien_avis_cfe", EC.element_to_be_clickable(
+                (By.XPATH, "//a[normalize-space()='Avis CFE']")), 10)
+        except TimeoutException:
+            self.limiteur.signaler_echec("page d'accueil non chargée")
+            return self.acceder_avis_cfe_du_siren(siren)
+
+        # L'échec du clic est déjà signalé au limiteur par naviguer()
+        try:
+            self.naviguer(lien_avis.click)
+        except WebDriverException:
             return self.acceder_avis_cfe_du_siren(siren)
 
         # S'assure que les champs sont vides
@@ -242,12 +453,15 @@ class Program:
             self.driver.find_element(By.ID, f"siren{i}").send_keys(digit)
 
         # Cliquer sur le bouton consulter
-        self.driver.find_element(By.NAME, "button.submitValider").click()
+        self.naviguer(self.driver.find_element(By.NAME, "button.submitValider").click)
 
         # Vérifier si une nouvelle fenêtre s'ouvre
+        self.instantanes.capturer(self.driver, "soumission_siren")
         if len(self.driver.window_handles) < 2:
-            print("SIREN non accessible.")
-            logging.error('SIREN - %s - INACCESSIBLE', siren)
+            logging.error('SIREN - %s - INACCESSIBLE', siren,
+                          extra={"siren": siren, "etape": "soumission_siren",
+                                 "resultat": "INACCESSIBLE"})
+            self.noter_resultat(siren, "INACCESSIBLE")
             return False
 
         # Passer à la fenêtre qui s'est ouverte
@@ -255,19 +469,23 @@ class Program:
 
         # Vérifier la présence de la page d'accueil, sinon réessayer
         try:
-            WebDriverWait(self.driver, 5).until(EC.presence_of_element_located(
-                (By.XPATH, "//*[contains(text(), 'Accueil du compte fiscal des professionnels')]")))
+            self.attendre("compte_fiscal", EC.presence_of_element_located(
+                (By.XPATH, "//*[contains(text(), 'Accueil du compte fiscal des professionnels')]")),
+                5)
         except TimeoutException:
+            self.limiteur.signaler_echec("compte fiscal non chargé")
             return self.acceder_avis_cfe_du_siren(siren)
 
         # Essayer de cliquer sur le bouton pour accéder aux avis de CFE
         try:
-            WebDriverWait(self.driver, 0.5).until(EC.presence_of_element_located(
-                (By.XPATH, "//a[@class='custom_bouton_cfe']"))).click()
+            bouton_cfe = self.attendre("bouton_cfe", EC.presence_of_element_located(
+                (By.XPATH, "//a[@class='custom_bouton_cfe']")), 0.5, absence_possible=True)
         except TimeoutException:
-            print("Pas de CFE, passage au SIREN suivant.")
-            logging.info('PAS DE CFE - SIREN - %s', siren)
+            logging.info('PAS DE CFE - SIREN - %s', siren,
+                         extra={"siren": siren, "etape": "bouton_cfe", "resultat": "PAS_DE_CFE"})
+            self.noter_resultat(siren, "PAS_DE_CFE")
             return False
+        self.naviguer(bouton_cfe.click)
         return True
 
     def traiter_lien_avis_imposition(self, code, nom, siren):
@@ -283,19 +501,26 @@ class Program:
 
         # Vérifier si aucun document n'est trouvé
         try:
-            WebDriverWait(self.driver, 1).until(EC.presence_of_element_located(
-                (By.CSS_SELECTOR, "div[class='messageTableau'] ul li")))
-            print("Pas de document trouvés.")
+            self.attendre("message_avis", EC.presence_of_element_located(
+                (By.CSS_SELECTOR, "div[class='messageTableau'] ul li")), 1,
+                absence_possible=True)
+            logging.info("Pas de document trouvés - SIREN - %s", siren,
+                         extra={"siren": siren, "etape": "message_avis",
+                                "resultat": "SANS_DOCUMENT"})
+            self.noter_resultat(siren, "SANS_DOCUMENT")
             return
         except TimeoutException:
             pass
 
         # Obtention des lignes de document s'il y en a, sinon retour
         try:
-            lignes = WebDriverWait(self.driver, 3).until(
-                EC.presence_of_all_elements_located((By.XPATH, "//tbody/tr")))
+            lignes = self.attendre("lignes_avis", EC.presence_of_all_elements_located(
+                (By.XPATH, "//tbody/tr")), 3, absence_possible=True)
         except TimeoutException:
-            print("Pas de document trouvés.")
+            logging.info("Pas de document trouvés - SIREN - %s", siren,
+                         extra={"siren": siren, "etape": "lignes_avis",
+                                "resultat": "SANS_DOCUMENT"})
+            self.noter_resultat(siren, "SANS_DOCUMENT")
             return
 
         # Clique sur le lien d'avis d'imposition pour chaque ligne et les renomme
@@ -304,11 +529,11 @@ class Program:
             if cellules:
 
                 lien = ligne.find_element(By.TAG_NAME, "a")
-                lien.click()
+                self.naviguer(lien.click)
                 logging.info("Clic sur le lien d'avis d'imposition.")
                 siret = f"{siren}{cellules[4].text.strip()}"
-                self.renommer_pdf_telecharge(code, nom, self.script_path, siret)
-                sleep(1)
+                self.renommer_pdf_telecharge(code, nom, self.dossier_telechargement, siret)
+        self.noter_resultat(siren, "SUCCES")
 
     def renommer_pdf_telecharge(self, code, nom_entreprise, dossier_telechargement, siret):
         """
@@ -327,12 +552,12 @@ class Program:
             f"{code}_{nom_entreprise.replace(' ', '_')}_"
             f"{siret.replace(' ', '')}_CFE_{annee}.pdf"
         )
-        chemin_source = os.path.join(dossier_telechargement, "Documents", "AvisCfe*.pdf")
+        chemin_source = os.path.join(dossier_telechargement, "AvisCfe*.pdf")
 
         # Recherche du fichier PDF dans le répertoire spécifié
         fichiers = glob.glob(chemin_source)
         if len(fichiers) == 0:
-            print("Fichier PDF correspondant introuvable.")
+            logging.error("Fichier PDF correspondant introuvable - SIRET - %s", siret)
             return
 
         fichier_original = fichiers[0]
@@ -343,8 +568,8 @@ class Program:
         os.rename(fichier_original, chemin_nouveau)
         os.makedirs(dossier_destination, exist_ok=True)
         shutil.move(chemin_nouveau, os.path.join(dossier_destination, nouveau_nom))
-        print("Le fichier renommé a été déplacé vers :"
-              f"{os.path.join(dossier_destination, nouveau_nom)}")
+        logging.info("Le fichier renommé a été déplacé vers : %s",
+                     os.path.join(dossier_destination, nouveau_nom))
 
     def fermer_fenetres(self):
         """
@@ -359,8 +584,15 @@ class Program:
         """
         Retourne à la page d'accueil du site.
         """
-        self.driver.get(LIEN_IMPOTS)
-        WebDriverWait(self.driver, 10).until(EC.url_to_be(LIEN_IMPOTS))
+        self.naviguer(self.driver.get, LIEN_IMPOTS)
+        try:
+            # Pas d'instantané : le tampon est vidé au début du dossier suivant
+            self.attendre("retour_accueil", EC.url_to_be(LIEN_IMPOTS), 10, instantane=False)
+        except TimeoutException:
+            # Le dossier suivant attend lui-même la page d'accueil avant de continuer
+            self.limiteur.signaler_echec("retour à l'accueil")
+            logging.warning("Retour à l'accueil trop long, nouvelle tentative.")
+            self.naviguer(self.driver.get, LIEN_IMPOTS)
 
 
 def afficher_aide():
@@ -376,10 +608,14 @@ def afficher_aide():
         Entrées :
         - Fichier 'SIREN.TXT' contenant les SIREN, noms d'entreprise et codes, au format :
             Siren;Nom;Code Dossier
+          ou, pour imposer le compte professionnel à utiliser :
+            Siren;Nom;Code Dossier;Identifiant
 
-        - Fichier 'identifiants.txt' avec les identifiants et le mot de passe, au format :
-            identifiant
-            mot_de_passe
+        - Fichier 'identifiants.txt' (optionnel) avec un ou plusieurs comptes, au format :
+            identifiant_1
+            mot_de_passe_1
+            identifiant_2
+            mot_de_passe_2
 
         Exemples d'utilisation :
             python recup_cfe.py imposition
@@ -432,72 +668,207 @@ def maj_avancee(app: Program, echec=False):
     app.avancee["dossiers_echec" if echec else "dossiers_succes"] += 1
 
 
-def traitement(app: Program, window_app: WindowApp):
-    """ Fonction de traitement des dossiers. """
-    try:
-        # Attente du clic sur le bouton ou fermeture de la fenêtre
-        window_app.wait_variable(window_app.var_activite)
+def lire_comptes(app: Program, web_data: dict) -> list:
+    """
+    Rassemble les comptes professionnels à utiliser : celui saisi dans la fenêtre, puis ceux
+    du fichier d'identifiants s'il existe.
 
-        if window_app.stopped:
-            return
+    Returns:
+        list: Une liste de tuples (identifiant, mot_de_passe), sans doublon d'identifiant.
 
-        print("Démarrage du traitement des dossiers...")
-        window_app.etat_app = "En cours de traitement..."
-        app.donnees = app.lire_donnees(window_app.web_data["fichier"])
-        app.avancee["dossiers_total"] = len(app.donnees)
-        app.avancee["dossiers_restants"] = len(app.donnees)
-        window_app.update_progression(app.avancee, initialisation=True)
+    Raises:
+        ValueError: Si aucun compte n'est renseigné.
+    """
+    comptes = []
+    if web_data["identifiant"]:
+        comptes.append((web_data["identifiant"], web_data["mot_de_passe"]))
+    if os.path.exists(app.credentials_file):
+        comptes += app.lire_identifiants()
+
+    # Un identifiant présent deux fois garde le premier mot de passe rencontré
+    comptes_uniques: dict = {}
+    for identifiant, mot_de_passe in comptes:
+        comptes_uniques.setdefault(identifiant, mot_de_passe)
+
+    if not comptes_uniques:
+        raise ValueError("Aucun compte professionnel renseigné.")
+    return list(comptes_uniques.items())
+
+
+def repartir_dossiers(donnees: list, identifiants: list) -> dict:
+    """
+    Répartit les dossiers entre les comptes professionnels. Un dossier dont la colonne compte
+    désigne un compte connu lui est attribué ; les autres vont au compte le moins chargé au
+    moment où ils sont rencontrés.
 
-        app.initialiser_driver(window_app.web_data["destination"])
+    Args:
+        donnees (list): Tuples (siren, nom, code, compte) dans l'ordre de traitement souhaité.
+        identifiants (list): Identifiants des comptes disponibles.
+
+    Returns:
+        dict: Les dossiers attribués à chaque identifiant, dans l'ordre de `donnees`.
+    """
+    repartition = {identifiant: [] for identifiant in identifiants}
+    for dossier in donnees:
+        identifiant = dossier[3]
+        if identifiant not in repartition:
+            if identifiant:
+                logging.warning("Compte %s inconnu pour le SIREN %s, répartition automatique.",
+                                identifiant, dossier[0])
+            identifiant = min(identifiants, key=lambda compte: len(repartition[compte]))
+        repartition[identifiant].append(dossier)
+    return repartition
+
+
+def cumuler_avancees(apps: list) -> dict:
+    """Additionne les données d'avancement de toutes les sessions."""
+    return {cle: sum(app.avancee[cle] for app in apps) for cle in apps[0].avancee}
+
+
+def afficher_progression(window_app: WindowApp, apps: list, initialisation: bool = False):
+    """Met à jour la fenêtre avec l'avancement cumulé de toutes les sessions."""
+    with VERROU_INTERFACE:
+        window_app.update_progression(cumuler_avancees(apps), initialisation=initialisation)
+
+
+def ecrire_rapport(apps: list, identifiants: list, chemin: str):
+    """
+    Consolide l'avancement de chaque compte dans un rapport unique au format CSV et le
+    journalise.
+
+    Args:
+        apps (list): Les sessions, une par compte.
+        identifiants (list): Les identifiants des comptes, dans le même ordre que `apps`.
+        chemin (str): Chemin du rapport CSV à écrire.
+    """
+    lignes = [(identifiant, app.avancee) for identifiant, app in zip(identifiants, apps)]
+    lignes.append(("TOTAL", cumuler_avancees(apps)))
+    cles = ("dossiers_total", "dossiers_traites", "dossiers_succes", "dossiers_echec",
+            "dossiers_restants")
+
+    with open(chemin, "w", encoding="utf-8") as fichier:
+        fichier.write(";".join(("compte",) + cles) + "\n")
+        for compte, avancee in lignes:
+            fichier.write(";".join([compte] + [str(avancee[cle]) for cle in cles]) + "\n")
+            logging.info("Rapport - %s - Dossiers: %d | Succès: %d | Échec: %d", compte,
+                         avancee["dossiers_total"], avancee["dossiers_succes"],
+                         avancee["dossiers_echec"])
+    logging.info("Rapport enregistré : %s", chemin)
+
+
+def traiter_compte(app: Program, compte: tuple, dossier_telechargement: str,
+                   window_app: WindowApp, apps: list):
+    """
+    Traite les dossiers attribués à un compte professionnel dans sa propre session Firefox.
+
+    Args:
+        app (Program): La session du compte, dont `donnees` contient les dossiers à traiter.
+        compte (tuple): Identifiant et mot de passe du compte.
+        dossier_telechargement (str): Répertoire de téléchargement propre à la session.
+        window_app (WindowApp): La fenêtre de l'application.
+        apps (list): Toutes les sessions, pour l'affichage de l'avancement cumulé.
+    """
+    identifiant, mot_de_passe = compte
+    try:
+        app.initialiser_driver(dossier_telechargement, nom_profil=identifiant)
 
-        app.connexion_site(window_app.web_data["identifiant"], window_app.web_data["mot_de_passe"])
+        app.connexion_site(identifiant, mot_de_passe)
 
-        for compteur, (siren, nom, code) in enumerate(app.donnees, start=1):
-            window_app.update_progression(app.avancee)
+        for compteur, (siren, nom, code, _) in enumerate(app.donnees, start=1):
+            afficher_progression(window_app, apps)
             if gestion_erreur(siren, nom, code):
                 maj_avancee(app, echec=True)
                 continue
 
             if not window_app:
-                print(f"Fenêtre fermée pendant le traitement. {compteur} dossiers traités.")
+                logging.info("Fenêtre fermée pendant le traitement. %d dossiers traités.",
+                             compteur)
                 return
 
-            print(f"Compteur: {compteur} | SIREN: {siren} | Nom: {nom} | Code: {code}")
+            logging.info("Compte: %s | Compteur: %d | SIREN: %s | Nom: %s | Code: %s",
+                         identifiant, compteur, siren, nom, code,
+                         extra={"siren": siren, "compte": identifiant, "etape": "debut"})
             app.traiter_siren(siren, nom, code)
+            app.historique.sauvegarder()
             app.fermer_fenetres()
             app.retour_accueil()
 
-        window_app.update_progression(app.avancee)
-        window_app.etat_app = "Programme terminé !"
-
     except Exception as e:
-        print(f"Erreur : {e}")
-        logging.exception("Erreur lors de l'exécution : %s", e)
+        logging.exception("Erreur lors du traitement du compte %s : %s", identifiant, e)
 
 
-def config_logging():
+def traitement(window_app: WindowApp, sessions: list):
     """
-    Configure les gestionnaires de logs pour enregistrer les logs d'info et d'erreur
-    dans des fichiers séparés.
+    Fonction de traitement des dossiers, répartis entre les comptes professionnels.
+
+    La session principale, dont l'historique est chargé depuis le disque, est créée ici plutôt
+    qu'avant l'affichage de la fenêtre, et ajoutée à `sessions` pour que `main()` puisse
+    enregistrer l'historique à la fermeture.
+
+    Args:
+        window_app (WindowApp): La fenêtre de l'application.
+        sessions (list): Liste, vide à l'appel, qui reçoit la session principale.
     """
-    logger = logging.getLogger("mon_logger")
-    logger.setLevel(logging.DEBUG)
+    app = None
+    try:
+        app = Program()
+        sessions.append(app)
 
-    info_handler = logging.FileHandler("log_infos.txt", encoding='utf-8')
-    info_handler.setLevel(logging.INFO)
-    info_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-    info_handler.setFormatter(info_formatter)
+        # Attente du clic sur le bouton ou fermeture de la fenêtre
+        window_app.wait_variable(window_app.var_activite)
+
+        if window_app.stopped:
+            return
 
-    error_handler = logging.FileHandler("log_erreurs.txt", encoding='utf-8')
-    error_handler.setLevel(logging.ERROR)
-    error_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-    error_handler.setFormatter(error_formatter)
+        importer_selenium()
+        logging.info("Démarrage du traitement des dossiers...")
+        window_app.etat_app = "En cours de traitement..."
+        comptes = lire_comptes(app, window_app.web_data)
+        identifiants = [identifiant for identifiant, _ in comptes]
+        donnees, ignores = app.historique.ordonner(
+            app.lire_donnees(window_app.web_data["fichier"]))
+        for siren, _, _, _ in ignores:
+            logging.info("SIREN - %s - IGNORÉ (improductif lors des %d dernières exécutions)",
+                         siren, app.historique.seuil_abandon)
+
+        # Une session par compte, partageant le limiteur de débit et l'historique
+        apps = [app] + [Program(app.limiteur, app.historique) for _ in comptes[1:]]
+        repartition = repartir_dossiers(donnees, identifiants)
+        for app_compte, identifiant in zip(apps, identifiants):
+            app_compte.donnees = repartition[identifiant]
+            app_compte.avancee["dossiers_total"] = len(app_compte.donnees)
+            app_compte.avancee["dossiers_restants"] = len(app_compte.donnees)
+            logging.info("Compte %s : %d dossiers attribués.", identifiant,
+                         len(app_compte.donnees))
+        afficher_progression(window_app, apps, initialisation=True)
+
+        threads = []
+        for numero, (app_compte, compte) in enumerate(zip(apps, comptes), start=1):
+            # Chaque session télécharge dans son propre répertoire pour ne pas mélanger les PDF
+            destination = window_app.web_data["destination"]
+            if len(comptes) > 1:
+                destination = os.path.join(destination, f"compte_{numero}")
+            thread = threading.Thread(
+                target=traiter_compte, name=f"compte_{numero}", daemon=True,
+                args=(app_compte, compte, destination, window_app, apps))
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            thread.join()
+
+        afficher_progression(window_app, apps)
+        window_app.etat_app = "Programme terminé !"
+        app.limiteur.journaliser_resume()
+        ecrire_rapport(apps, identifiants, os.path.join(app.script_path, "rapport_comptes.csv"))
 
-    if not logger.hasHandlers():
-        logger.addHandler(info_handler)
-        logger.addHandler(error_handler)
+    except Exception as e:
+        logging.exception("Erreur lors de l'exécution : %s", e)
+        window_app.etat_app = f"Erreur : {e}"
 
-    return logger
+    finally:
+        if app:
+            app.historique.sauvegarder()
 
 
 def main():
@@ -505,31 +876,70 @@ def main():
     Fonction principale qui initialise le journal de logs, crée une instance de la classe Program,
     et traite chaque SIREN, nom, et code.
     """
+    parser = argparse.ArgumentParser(description="Téléchargement des avis de CFE.")
+    parser.add_argument("--mesure-demarrage", action="store_true",
+                        help="Ferme l'application dès l'affichage de la fenêtre (benchmark).")
+    parser.add_argument("--profilage", action="store_true",
+                        help="Active le profilage des piles et de la mémoire "
+                             "(équivalent à CFE_PROFILAGE=1).")
+    arguments = parser.parse_args()
+
+    script_path = os.path.dirname(os.path.abspath(sys.argv[0]))
+    # Le benchmark ne crée ni ne purge de fichier de logs, pour préserver ceux des vraies
+    # exécutions
+    ecrivain_logs = None
+    if not arguments.mesure_demarrage:
+        ecrivain_logs = configurer_journalisation(script_path)
+    profileur = None
+    try:
+        logging.info("Démarrage du script...")
+        window_app = WindowApp()
 
-    print("Démarrage du script...")
-    # Initialisation des classes de l'application
-    logging.basicConfig(filename='log.txt', encoding='utf-8',
-                        level=logging.INFO, format='%(asctime)s - %(message)s')
-    logger = config_logging()
-    app = Program()
-    window_app = WindowApp()
+        if arguments.mesure_demarrage:
+            def fermer_apres_affichage(event):
+                """Ferme l'application dès que la fenêtre principale est affichée."""
+                if event.widget is window_app and not window_app.stopped:
+                    window_app.after_idle(window_app.quitter)
 
-    # Lancement du traitement dans un thread
-    thread = threading.Thread(target=traitement, args=(app, window_app), daemon=True)
-    thread.start()
+            window_app.bind("<Map>", fermer_apres_affichage, add="+")
 
-    # Gestion de l'interface
-    try:
-        window_app.mainloop()
-    except Exception as e:
-        logger.exception("Erreur lors de l'exécution de l'interface : %s", e)
-        print(f"Erreur tkinter : {e}")
+        profileur = Profileur.depuis_environnement(script_path, arguments.profilage)
+        if profileur:
+            profileur.demarrer()
 
-    if window_app.stopped:
-        print("La fenêtre a été fermée. Arrêt du script.")
-        return
+        # Lancement du traitement dans un thread, qui crée aussi la session principale pour ne
+        # pas retarder le premier affichage de la fenêtre
+        sessions = []
+        thread = threading.Thread(target=traitement, args=(window_app, sessions),
+                                  name="traitement", daemon=True)
+        thread.start()
 
-    print("Script terminé !")
+        # Préchargement de Selenium en arrière-plan une fois la fenêtre affichée
+        window_app.after(500, threading.Thread(target=importer_selenium, daemon=True).start)
+
+        # Gestion de l'interface
+        try:
+            window_app.mainloop()
+        except Exception as e:
+            logging.exception("Erreur lors de l'exécution de l'interface : %s", e)
+
+        # Les sessions sont des threads démons : l'historique est enregistré avant de quitter
+        if sessions and not arguments.mesure_demarrage:
+            sessions[0].historique.sauvegarder()
+
+        if window_app.stopped:
+            logging.info("La fenêtre a été fermée. Arrêt du script.")
+        else:
+            logging.info("Script terminé !")
+    except Exception as e:
+        logging.exception("Erreur lors du démarrage de l'application : %s", e)
+        raise
+    finally:
+        # Les résultats du profilage et la file des logs sont écrits même après une erreur
+        if profileur:
+            profileur.arreter()
+        if ecrivain_logs:
+            ecrivain_logs.stop()
 
 
 if __name__ == "__main__":
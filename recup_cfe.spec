@@ -1,8 +1,17 @@
 # -*- mode: python ; coding: utf-8 -*-
+# Variante de construction choisie par la variable d'environnement CFE_BUILD :
+# - 'onefile' (défaut) : un seul exécutable, décompressé dans un répertoire temporaire à chaque
+#   lancement ;
+# - 'onedir' : un répertoire prêt à l'emploi, sans décompression ni UPX, au démarrage plus rapide.
+import os
+
 from PyInstaller.utils.hooks import collect_data_files
 
+ONEDIR = os.environ.get("CFE_BUILD", "onefile") == "onedir"
+
 datas = []
-datas += collect_data_files('selenium')
+# Seul le selenium-manager Windows est utile : ceux de Linux et macOS sont exclus
+datas += collect_data_files('selenium', excludes=['**/linux/*', '**/macos/*'])
 datas += collect_data_files('customtkinter')
 
 
@@ -15,29 +24,56 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['lib2to3', 'pydoc_data', 'test'],
     noarchive=False,
-    optimize=0,
 )
 pyz = PYZ(a.pure)
 
-exe = EXE(
-    pyz,
-    a.scripts,
-    a.binaries,
-    a.datas,
-    [],
-    name='recup_cfe',
-    debug=False,
-    bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
-    console=True,
-    disable_windowed_traceback=False,
-    argv_emulation=False,
-    target_arch=None,
-    codesign_identity=None,
-    entitlements_file=None,
-)
+if ONEDIR:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        [],
+        exclude_binaries=True,
+        name='Telechargement_CFE',
+        debug=False,
+        bootloader_ignore_signals=False,
+        strip=False,
+        upx=False,
+        console=False,
+        disable_windowed_traceback=False,
+        argv_emulation=False,
+        target_arch=None,
+        codesign_identity=None,
+        entitlements_file=None,
+    )
+    coll = COLLECT(
+        exe,
+        a.binaries,
+        a.datas,
+        strip=False,
+        upx=False,
+        upx_exclude=[],
+        name='Telechargement_CFE',
+    )
+else:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        a.binaries,
+        a.datas,
+        [],
+        name='Telechargement_CFE',
+        debug=False,
+        bootloader_ignore_signals=False,
+        strip=False,
+        upx=True,
+        upx_exclude=[],
+        runtime_tmpdir=None,
+        console=False,
+        disable_windowed_traceback=False,
+        argv_emulation=False,
+        target_arch=None,
+        codesign_identity=None,
+        entitlements_file=None,
+    )